@@ -1,7 +1,7 @@
 # helper/chunker.py
 
 import re
-from typing import List
+from typing import Iterable, Iterator, List
 import logging
 
 """
@@ -26,6 +26,54 @@ COMMON_ABBREVIATIONS = {
     "U.S.", "U.S.A.", "U.K.", "EU.", "UN.",
     "Jan.", "Feb.", "Mar.", "Apr.", "Aug.", "Sept.", "Oct.", "Nov.", "Dec.",
 }
+
+
+
+def _append_nonempty(chunks: List[str], chunk: str) -> None:
+    """Strips `chunk` and appends it only if something is left."""
+    chunk = chunk.strip()
+    if chunk:
+        chunks.append(chunk)
+
+
+def _build_sentence_splitter(abbreviations: set) -> "re.Pattern[str]":
+    """
+    Compiles a sentence-boundary regex that never splits after an abbreviation.
+
+    Each abbreviation becomes a fixed-width negative lookbehind, so the check
+    runs inside the regex engine in the same pass as the split itself. The
+    abbreviation only counts when no word character precedes it, so it is
+    still recognised after an opening bracket or quote ("(Dr.", "\"Mr.").
+    """
+    guards = "".join(
+        rf"(?<!{pattern})" for pattern in _abbreviation_patterns(abbreviations)
+    )
+    return re.compile(rf"(?<=[.!?]){guards}\s+")
+
+
+def _build_abbreviation_gap(abbreviations: set) -> "re.Pattern[str]":
+    """
+    Compiles a regex matching the whitespace right after an abbreviation,
+    i.e. exactly the gaps `_build_sentence_splitter` refuses to split on.
+    """
+    after = "|".join(rf"(?<={pattern})" for pattern in _abbreviation_patterns(abbreviations))
+    return re.compile(rf"(?:{after})\s+")
+
+
+def _abbreviation_patterns(abbreviations: set) -> List[str]:
+    """Escaped abbreviations, longest first, each only counting when no word character precedes it."""
+    return [
+        rf"(?<!\w){re.escape(abbr)}"
+        for abbr in sorted(abbreviations, key=len, reverse=True)
+    ]
+
+
+# Patterns are compiled once at import time instead of on every call.
+_SENT_SPLIT = _build_sentence_splitter(COMMON_ABBREVIATIONS)
+_ABBREV_GAP = _build_abbreviation_gap(COMMON_ABBREVIATIONS)
+_PARA_SPLIT = re.compile(r"\n\s*\n")
+
+
 def chunk_fixed(text: str, size: int = 800, overlap: int = 200) -> List[str]:
     """
     Splits the input text into fixed-size character chunks with overlap.
@@ -42,14 +90,51 @@ def chunk_fixed(text: str, size: int = 800, overlap: int = 200) -> List[str]:
     Returns:
         List[str]: A list of non-empty, trimmed text chunks.
     """
-    tokens = list(text)
-    chunks = []
-    i = 0
-    while i < len(tokens):
-        chunk = tokens[i:i+size]
-        chunks.append("".join(chunk).strip())
-        i += size - overlap
-    return [c for c in chunks if c]
+    _check_fixed_params(size, overlap)
+    return list(chunk_fixed_stream([text], size, overlap))
+
+
+def _check_fixed_params(size: int, overlap: int) -> None:
+    if size <= 0:
+        raise ValueError("size must be greater than 0.")
+    if not 0 <= overlap < size:
+        raise ValueError("overlap must be between 0 and size - 1.")
+
+
+def chunk_fixed_stream(pieces: Iterable[str], size: int = 800, overlap: int = 200) -> Iterator[str]:
+    """
+    Lazily yields fixed-size overlapping chunks from a stream of text pieces.
+
+    Produces exactly the chunks of `chunk_fixed` on `"".join(pieces)`, but
+    only keeps a rolling window of at most one piece plus `size` characters,
+    emitting each chunk as soon as its window is complete.
+
+    Args:
+        pieces (Iterable[str]): Consecutive pieces of the text, e.g. from
+            `extract_text_iter`.
+        size (int, optional): The number of characters per chunk. Defaults to 800.
+        overlap (int, optional): The number of overlapping characters between chunks. Defaults to 200.
+
+    Yields:
+        str: Non-empty, trimmed text chunks.
+    """
+    _check_fixed_params(size, overlap)
+    step = size - overlap
+    window = ""
+    start = 0
+
+    for piece in pieces:
+        window = window[start:] + piece
+        start = 0
+        while len(window) - start >= size:
+            chunk = window[start:start + size].strip()
+            if chunk:
+                yield chunk
+            start += step
+    for i in range(start, len(window), step):
+        chunk = window[i:i + size].strip()
+        if chunk:
+            yield chunk
 
 
 
@@ -72,25 +157,27 @@ def chunk_by_sentences(text: str, max_len: int = 1000) -> List[str]:
         raise ValueError("Input must be a string.")
     if max_len <= 0:
         raise ValueError("max_len must be greater than 0.")
-    raw_sentences = re.split(r'(?<=[.!?])\s+', text)
+    # A sentence runs on across an abbreviation with a single space, e.g.
+    # "Mr.\nSmith" -> "Mr. Smith", as if it had been split there and rejoined
+    raw_sentences = _SENT_SPLIT.split(_ABBREV_GAP.sub(" ", text))
     chunks = []
-    buffer = ""
+    buf: List[str] = []
+    buf_len = 0
 
     for sentence in raw_sentences:
-        last_word = buffer.strip().split()[-1] if buffer.strip() else ""
-        if last_word in COMMON_ABBREVIATIONS:
-            buffer += " " + sentence
-        elif len(buffer) + len(sentence) < max_len:
-            buffer += " " + sentence if buffer else sentence
+        if buf_len + len(sentence) < max_len:
+            buf_len += len(sentence) + 1 if buf else len(sentence)
+            buf.append(sentence)
         else:
-            if buffer:
-                chunks.append(buffer.strip())
-            buffer = sentence
+            if buf:
+                _append_nonempty(chunks, " ".join(buf))
+            buf = [sentence]
+            buf_len = len(sentence)
 
-    if buffer:
-        chunks.append(buffer.strip())
+    if buf:
+        _append_nonempty(chunks, " ".join(buf))
 
-    return [c for c in chunks if c]
+    return chunks
 
 
 def chunk_by_paragraphs(text: str, max_len: int = 1200) -> List[str]:
@@ -112,19 +199,73 @@ def chunk_by_paragraphs(text: str, max_len: int = 1200) -> List[str]:
         raise ValueError("Input must be a string.")
     if max_len <= 0:
         raise ValueError("max_len must be greater than 0.")
-    text = re.sub(r"\n\s*\n+", "\n\n", text).strip()
+    return list(chunk_by_paragraphs_stream([text], max_len))
 
-    paragraphs = re.split(r"\n\s*\n", text)
-    chunks = []
-    buffer = ""
 
-    for para in paragraphs:
-        if len(buffer) + len(para) < max_len:
-            buffer += "\n\n" + para
-        else:
-            chunks.append(buffer.strip())
-            buffer = para
-    if buffer:
-        chunks.append(buffer.strip())
+def _iter_paragraphs(pieces: Iterable[str]) -> Iterator[str]:
+    """
+    Yields the blank-line separated paragraphs of `"".join(pieces).strip()`
+    without joining the pieces. A separator is only split on once a
+    non-blank character follows it, since the next piece could extend it.
+    """
+    pending = ""
+    # End of the last non-blank character in `pending`. Everything before it
+    # has already been scanned, so a new separator can only start here.
+    tail = 0
+    for piece in pieces:
+        if not pending:
+            piece = piece.lstrip()
+        scan_from = tail
+        pending += piece
+        body_len = len(piece.rstrip())
+        if body_len:
+            tail = len(pending) - len(piece) + body_len
+        last = 0
+        for m in _PARA_SPLIT.finditer(pending, scan_from):
+            if m.end() >= tail:
+                break
+            yield pending[last:m.start()]
+            last = m.end()
+        pending = pending[last:]
+        tail -= last
+    yield from _PARA_SPLIT.split(pending.rstrip())
 
-    return [c for c in chunks if c]
\ No newline at end of file
+
+def chunk_by_paragraphs_stream(pieces: Iterable[str], max_len: int = 1200) -> Iterator[str]:
+    """
+    Lazily yields paragraph-based chunks from a stream of text pieces.
+
+    Produces exactly the chunks of `chunk_by_paragraphs` on `"".join(pieces)`,
+    but only holds the current paragraph and chunk in memory, so the full
+    document never has to be built as a single string. Piece boundaries
+    carry no meaning; paragraphs are still split on blank lines only.
+
+    Args:
+        pieces (Iterable[str]): Consecutive pieces of the text, e.g. from
+            `extract_text_iter`.
+        max_len (int, optional): Maximum number of characters per chunk. Defaults to 1200.
+
+    Yields:
+        str: Paragraph-based text chunks.
+    """
+    if max_len <= 0:
+        raise ValueError("max_len must be greater than 0.")
+    buf: List[str] = []
+    # Counts a "\n\n" per buffered paragraph, the first one included
+    buf_len = 0
+
+    for para in _iter_paragraphs(pieces):
+        if buf_len + len(para) < max_len:
+            buf_len += len(para) + 2
+            buf.append(para)
+        else:
+            if buf:
+                chunk = "\n\n".join(buf).strip()
+                if chunk:
+                    yield chunk
+            buf = [para]
+            buf_len = len(para)
+    if buf:
+        chunk = "\n\n".join(buf).strip()
+        if chunk:
+            yield chunk
@@ -1,13 +1,16 @@
 # helper/database.py
 import os
 import logging
+import threading
 import psycopg2
 import numpy as np
 from psycopg2 import pool
-from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT, register_adapter, AsIs
+from psycopg2.extras import execute_values
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT, connection as pg_connection
 from pgvector.psycopg2 import register_vector
 from dotenv import load_dotenv
 from contextlib import contextmanager
+from typing import Optional
 
 # Load environment variables from .env
 load_dotenv()
@@ -19,27 +22,74 @@ PASSWORD = os.getenv("POSTGRES_PASSWORD")
 HOST = os.getenv("POSTGRES_HOST", "localhost")
 PORT = int(os.getenv("POSTGRES_PORT", 5432))
 
-# Set up connection pool (singleton)
-try:
-    _pool = pool.SimpleConnectionPool(
-        minconn=1,
-        maxconn=5,
-        dbname=DB_NAME,
-        user=USER,
-        password=PASSWORD,
-        host=HOST,
-        port=PORT
-    )
-    log.info("✅ Connection pool created.")
-except Exception as e:
-    log.exception("❌ Failed to initialize connection pool.")
-    raise
+# HNSW index build parameters and per-session search breadth (pgvector defaults)
+HNSW_M = int(os.getenv("HNSW_M", 16))
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", 64))
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", 40))
+# pgvector rejects hnsw.ef_search values above this
+HNSW_EF_SEARCH_MAX = 1000
+
+# Pool size. Returned connections beyond POOL_MIN_CONN idle ones are closed,
+# along with their per-connection state (pgvector registration, prepared
+# searches); POOL_MIN_CONN connections are opened when the pool is created.
+POOL_MIN_CONN = int(os.getenv("POSTGRES_POOL_MIN", 2))
+POOL_MAX_CONN = int(os.getenv("POSTGRES_POOL_MAX", 16))
+
+# Storage precision of chunks.embedding: "halfvec" (fp16, pgvector >= 0.7) or "float32"
+VECTOR_PRECISION = os.getenv("VECTOR_PRECISION", "float32").lower()
+if VECTOR_PRECISION not in ("halfvec", "float32"):
+    raise ValueError(f"VECTOR_PRECISION must be 'halfvec' or 'float32', got '{VECTOR_PRECISION}'.")
+VECTOR_TYPE = "halfvec" if VECTOR_PRECISION == "halfvec" else "vector"
+EMBEDDING_SQL_TYPE = f"{VECTOR_TYPE}(768)"
+
+class PooledConnection(pg_connection):
+    """
+    psycopg2 connection that can carry per-session state (e.g. whether
+    pgvector is registered). The base C type does not accept new attributes.
+    """
+
+
+# Thread-safe connection pool (singleton), shared by indexing and search.
+# Created on first use, so processes that only import this module (e.g.
+# spawned extraction workers re-importing __main__) open no connections.
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> pool.ThreadedConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                try:
+                    _pool = pool.ThreadedConnectionPool(
+                        minconn=POOL_MIN_CONN,
+                        maxconn=POOL_MAX_CONN,
+                        dbname=DB_NAME,
+                        user=USER,
+                        password=PASSWORD,
+                        host=HOST,
+                        port=PORT,
+                        connection_factory=PooledConnection
+                    )
+                    log.info("✅ Connection pool created.")
+                except Exception:
+                    log.exception("❌ Failed to initialize connection pool.")
+                    raise
+    return _pool
 
 
 def get_connection():
     """
     Retrieves a connection from the pool and registers pgvector extension.
 
+    The pgvector type lookup runs only the first time a physical connection
+    is handed out; the connection is flagged so later checkouts skip it.
+    The flag lives only as long as the connection: the pool keeps at most
+    POOL_MIN_CONN idle connections and closes any other one on release, so
+    under higher concurrency the extra connections register again every
+    time. Set POSTGRES_POOL_MIN to the expected concurrency to avoid that.
+
     Returns:
         connection (psycopg2.extensions.connection): 
             A live PostgreSQL connection with pgvector support.
@@ -47,8 +97,10 @@ def get_connection():
     Raises:
         Exception: If a connection could not be obtained from the pool.
     """
-    conn = _pool.getconn()
-    register_vector(conn)
+    conn = _get_pool().getconn()
+    if not getattr(conn, "_pgvector_registered", False):
+        register_vector(conn)
+        conn._pgvector_registered = True
     return conn
 
 
@@ -61,26 +113,90 @@ def release_connection(conn):
             The connection object to return to the pool.
     """
     if conn:
-        _pool.putconn(conn)
+        _get_pool().putconn(conn)
 
 
 def insert_chunk(chunk_text: str, embedding: np.ndarray, filename: str, strategy: str):
     """
     Inserts a single chunk into the 'chunks' table.
+
+    Thin wrapper over `insert_chunks_bulk`, so single-row callers share the
+    same pooled write path as bulk ingest.
+    """
+    insert_chunks_bulk([(chunk_text, embedding, filename, strategy)])
+
+
+def insert_chunks_bulk(rows: list[tuple[str, np.ndarray, str, str]], page_size: int = 500) -> int:
+    """
+    Inserts many chunks into the 'chunks' table in a single transaction.
+
+    Rows are sent with `execute_values`, so each page of `page_size` rows
+    costs one round-trip instead of one per row.
+
+    Args:
+        rows (list[tuple]): (chunk_text, embedding, filename, strategy) tuples.
+        page_size (int, optional): Rows per INSERT statement. Defaults to 500.
+
+    Returns:
+        int: Number of rows written: all of them, or 0 if the transaction
+        failed and was rolled back (the error is logged).
     """
+    if not rows:
+        return 0
     try:
         with pooled_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    INSERT INTO chunks (chunk_text, embedding, filename, split_strategy)
-                    VALUES (%s, %s, %s, %s);
-                    """,
-                    (chunk_text or "", embedding, filename or "unknown", strategy or "unspecified")
-                )
-                conn.commit()
-    except Exception as e:
-        log.exception("❌ Failed to insert chunk.")
+            with conn:  # commits once on success, rolls back on error
+                with conn.cursor() as cur:
+                    execute_values(
+                        cur,
+                        """
+                        INSERT INTO chunks (chunk_text, embedding, filename, split_strategy)
+                        VALUES %s;
+                        """,
+                        [
+                            (
+                                chunk_text or "",
+                                np.asarray(embedding, dtype=np.float32),
+                                filename or "unknown",
+                                strategy or "unspecified"
+                            )
+                            for chunk_text, embedding, filename, strategy in rows
+                        ],
+                        template=f"(%s, %s::{VECTOR_TYPE}, %s, %s)",
+                        page_size=page_size
+                    )
+        return len(rows)
+    except Exception:
+        log.exception(f"❌ Failed to bulk insert {len(rows)} chunks; none were saved.")
+        return 0
+
+
+def delete_chunks(filename: str, strategy: str) -> int:
+    """
+    Deletes every chunk of one document indexed with one split strategy.
+
+    Args:
+        filename (str): Source file name, as stored by `insert_chunks_bulk`.
+        strategy (str): Chunking strategy.
+
+    Returns:
+        int: Number of rows deleted.
+
+    Raises:
+        Exception: Any database error, after logging it.
+    """
+    try:
+        with pooled_connection() as conn:
+            with conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        "DELETE FROM chunks WHERE filename = %s AND split_strategy = %s;",
+                        (filename, strategy)
+                    )
+                    return cur.rowcount
+    except Exception:
+        log.exception(f"❌ Failed to delete chunks of '{filename}' ({strategy}).")
+        raise
 
 
 def check_connection():
@@ -127,16 +243,30 @@ def create_database():
         exit(1)
 
 
-def create_table():
+def create_table(migrate: bool = False):
     """
     Creates the 'chunks' table with required schema, including the pgvector extension.
 
+    Args:
+        migrate (bool, optional): Convert an existing 'chunks.embedding' column
+            whose type differs from VECTOR_PRECISION. This drops and rebuilds
+            the HNSW index, so it is opt-in. Defaults to False.
+
     Returns:
         None
 
+    Raises:
+        Exception: Any database error, after printing it, so callers such
+            as `reset_database` do not report a half-built schema as done.
+
     Notes:
         - Enables the 'vector' extension if missing.
-        - Creates table only if it does not already exist.
+        - Creates table only if it does not already exist, with the embedding
+          column typed by VECTOR_PRECISION (env).
+        - Converts an existing column to that precision via
+          `migrate_vector_precision` only when `migrate` is set; otherwise a
+          mismatch is just reported.
+        - Creates the search indexes via `ensure_indexes`.
     """
     try:
         with pooled_connection() as conn:
@@ -149,39 +279,123 @@ def create_table():
                     print("💡 Tip: Make sure you're connected to the Docker container with pgvector pre-installed.")
                     exit(1)
 
-                cur.execute("""
+                cur.execute(f"""
                     CREATE TABLE IF NOT EXISTS chunks (
                         id SERIAL PRIMARY KEY,
                         chunk_text TEXT NOT NULL,
-                        embedding VECTOR(768),
+                        embedding {EMBEDDING_SQL_TYPE},
                         filename TEXT,
                         split_strategy TEXT,
                         created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
                     );
                 """)
+                column_type = _embedding_column_type(cur)
                 conn.commit()
                 print("✅ Table 'chunks' created or already exists.")
     except Exception as e:
         print(f"❌ Failed to create table: {e}")
-
-
-def adapt_list(lst):
+        raise
+
+    if migrate:
+        migrate_vector_precision()
+    elif column_type not in (None, EMBEDDING_SQL_TYPE):
+        log.warning(
+            f"⚠️ 'chunks.embedding' is {column_type} but VECTOR_PRECISION={VECTOR_PRECISION} "
+            f"expects {EMBEDDING_SQL_TYPE}; left unchanged. Run `python -m helper.setup_db --migrate` "
+            "to convert it (drops and rebuilds the HNSW index)."
+        )
+    ensure_indexes()
+
+
+def _embedding_column_type(cur) -> Optional[str]:
+    """Returns the SQL type of 'chunks.embedding', e.g. "vector(768)", or None if there is no such column."""
+    cur.execute("""
+        SELECT format_type(atttypid, atttypmod)
+        FROM pg_attribute
+        WHERE attrelid = 'chunks'::regclass AND attname = 'embedding';
+    """)
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def migrate_vector_precision():
     """
-    Adapts Python list to SQL-compatible array format.
-
-    Args:
-        lst (list): A Python list.
+    Converts 'chunks.embedding' to the column type selected by VECTOR_PRECISION.
 
     Returns:
-        AsIs: A SQL-compatible representation for array.
+        None
+
+    Notes:
+        - No-op when the column already has the configured type.
+        - The HNSW index is dropped first (its opclass is tied to the column
+          type) and must be rebuilt with `ensure_indexes` afterwards.
+        - Setting VECTOR_PRECISION=float32 and running this again rolls a
+          halfvec column back to `vector(768)`.
     """
-    return AsIs(f"ARRAY{lst}")
+    try:
+        with pooled_connection() as conn:
+            with conn.cursor() as cur:
+                column_type = _embedding_column_type(cur)
+                if column_type is None or column_type == EMBEDDING_SQL_TYPE:
+                    return
 
+                log.warning(
+                    f"⚠️ Dropping index 'chunks_embedding_hnsw' to convert 'chunks.embedding' "
+                    f"from {column_type} to {EMBEDDING_SQL_TYPE}; searches are unindexed until it is rebuilt."
+                )
+                cur.execute("DROP INDEX IF EXISTS chunks_embedding_hnsw;")
+                cur.execute(f"""
+                    ALTER TABLE chunks
+                    ALTER COLUMN embedding TYPE {EMBEDDING_SQL_TYPE}
+                    USING embedding::{EMBEDDING_SQL_TYPE};
+                """)
+                conn.commit()
+                print(f"🔁 Column 'chunks.embedding' converted from {column_type} to {EMBEDDING_SQL_TYPE}.")
+    except Exception as e:
+        print(f"❌ Failed to migrate embedding column: {e}")
+        raise
 
-register_adapter(list, adapt_list)
 
+def ensure_indexes():
+    """
+    Creates the search indexes on the 'chunks' table if they do not exist yet.
 
+    Returns:
+        None
 
+    Notes:
+        - Builds an HNSW index with `vector_cosine_ops` (`halfvec_cosine_ops`
+          when VECTOR_PRECISION=halfvec), the opclass matching the `<=>`
+          operator used by search, so ordered searches avoid a sequential scan.
+        - Build parameters come from HNSW_M / HNSW_EF_CONSTRUCTION (env).
+        - Adds a B-tree on (filename, split_strategy) so filtered searches
+          have an attribute-index path as well.
+        - The index is maintained on every insert; for a large one-off ingest
+          it is cheaper to drop it, load the data and call this again.
+    """
+    try:
+        with pooled_connection() as conn:
+            with conn.cursor() as cur:
+                # LOCAL: must not outlive this transaction on the pooled connection
+                cur.execute("SET LOCAL maintenance_work_mem = '512MB';")
+                cur.execute(
+                    f"""
+                    CREATE INDEX IF NOT EXISTS chunks_embedding_hnsw
+                    ON chunks USING hnsw (embedding {VECTOR_TYPE}_cosine_ops)
+                    WITH (m = %s, ef_construction = %s);
+                    """,
+                    (HNSW_M, HNSW_EF_CONSTRUCTION)
+                )
+                cur.execute("""
+                    CREATE INDEX IF NOT EXISTS chunks_meta_idx
+                    ON chunks (filename, split_strategy);
+                """)
+                conn.commit()
+                print("🧭 HNSW index on 'chunks.embedding' created or already exists.")
+                print("🗂️ B-tree index on 'chunks(filename, split_strategy)' created or already exists.")
+    except Exception as e:
+        print(f"❌ Failed to create indexes: {e}")
+        raise
 
 
 @contextmanager
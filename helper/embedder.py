@@ -1,7 +1,8 @@
 # helper/embedder.py
 
 import os
-from typing import List
+from typing import List, Union
+import numpy as np
 import google.generativeai as genai
 from dotenv import load_dotenv
 
@@ -20,14 +21,17 @@ genai.configure(api_key=GEMINI_API_KEY)
 # Default model
 DEFAULT_MODEL = "models/text-embedding-004"
 EMBEDDING_DIM = 768
+# Gemini accepts at most 100 texts per batchEmbedContents request
+EMBEDDING_BATCH_SIZE = 100
 
 
 
 
-def get_embedding(text: str, model: str = DEFAULT_MODEL) -> List[float]:
+def get_embedding(text: str, model: str = DEFAULT_MODEL) -> np.ndarray:
     """
     Generates a text embedding using Google Gemini API.
-    Returns a list of floats with length 768 (for model=text-embedding-004).
+    Returns a float32 array of shape (768,) (for model=text-embedding-004),
+    ready for pgvector's ndarray adapter.
     Raises:
         ValueError: on empty text or invalid embedding response
         RuntimeError: on API/SDK/network failures
@@ -45,16 +49,53 @@ def get_embedding(text: str, model: str = DEFAULT_MODEL) -> List[float]:
         embedding = res.get("embedding")
         if not embedding or len(embedding) != EMBEDDING_DIM:
             raise ValueError("Invalid embedding response from Gemini.")
-        return embedding
+        return np.asarray(embedding, dtype=np.float32)
 
     except Exception as e:
         raise RuntimeError(f"Embedding generation failed: {e}")
 
 
-def l2_normalize(vec: List[float]) -> List[float]:
+def get_embeddings_batch(texts: List[str], model: str = DEFAULT_MODEL) -> np.ndarray:
     """
-    Applies L2 normalization to a vector (unit norm).
-    Useful for cosine similarity consistency.
+    Generates embeddings for a batch of texts in a single Gemini API request.
+    Returns a float32 array of shape (len(texts), 768), rows in input order.
+    Raises:
+        ValueError: on empty/oversized batch, empty text or invalid embedding response
+        RuntimeError: on API/SDK/network failures
+    """
+    if not texts:
+        raise ValueError("Batch is empty – cannot generate embeddings.")
+    if len(texts) > EMBEDDING_BATCH_SIZE:
+        raise ValueError(f"Batch too large: {len(texts)} > {EMBEDDING_BATCH_SIZE} texts.")
+    if any(not isinstance(t, str) or not t.strip() for t in texts):
+        raise ValueError("Batch contains empty text – cannot generate embeddings.")
+
+    try:
+        res = genai.embed_content(
+            model=model,
+            content=texts,
+            task_type="retrieval_document"
+        )
+        embeddings = res.get("embedding")
+        if (
+            not embeddings
+            or len(embeddings) != len(texts)
+            or any(len(e) != EMBEDDING_DIM for e in embeddings)
+        ):
+            raise ValueError("Invalid batch embedding response from Gemini.")
+        return np.asarray(embeddings, dtype=np.float32)
+
+    except Exception as e:
+        raise RuntimeError(f"Batch embedding generation failed: {e}")
+
+
+def l2_normalize(vec: Union[List[float], np.ndarray]) -> np.ndarray:
+    """
+    Applies L2 normalization (unit norm) and returns a float32 array.
+    A 2-D input is normalized row by row; zero vectors are returned unchanged.
+    Useful for cosine similarity consistency, and suitable for passing
+    straight to pgvector.
     """
-    norm = sum(x * x for x in vec) ** 0.5 or 1.0
-    return [x / norm for x in vec]
\ No newline at end of file
+    v = np.asarray(vec, dtype=np.float32)
+    norm = np.linalg.norm(v, axis=-1, keepdims=True)
+    return v / np.maximum(norm, 1e-12)
@@ -1,6 +1,7 @@
 # helper/reset_db.py
 import psycopg2
 import os
+import sys
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 from dotenv import load_dotenv
 
@@ -31,9 +32,9 @@ def reset_database():
         conn.close()
     except Exception as e:
         print(f"❌ Failed to reset database: {e}")
-        return
+        raise
 
-    # Reconnect to the new clean DB and set up table + extension
+    # Reconnect to the new clean DB and enable the extension
     try:
         conn = psycopg2.connect(
             dbname=DB_NAME,
@@ -45,21 +46,24 @@ def reset_database():
         with conn.cursor() as cur:
             cur.execute("CREATE EXTENSION IF NOT EXISTS vector;")
             print("🧬 pgvector extension enabled.")
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS chunks (
-                    id SERIAL PRIMARY KEY,
-                    chunk_text TEXT NOT NULL,
-                    embedding VECTOR(768),
-                    filename TEXT,
-                    split_strategy TEXT,
-                    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
-                );
-            """)
             conn.commit()
-            print("✅ Table 'chunks' created.")
         conn.close()
     except Exception as e:
         print(f"❌ Failed to initialize new DB: {e}")
+        raise
+
+    # Called only now: helper.database's pool needs the DB to exist, and it
+    # registers the vector type, which needs the extension.
+    # create_table owns the schema (incl. VECTOR_PRECISION) and the indexes.
+    from helper.database import create_table
+    create_table()
 
 if __name__ == "__main__":
-    reset_database()
+    # Run as `python helper/reset_db.py`: put the project root on the path so
+    # the late `helper.database` import resolves (as it does with `-m`)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    try:
+        reset_database()
+    except Exception:
+        # The failing step has already printed why
+        sys.exit(1)
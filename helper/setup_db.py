@@ -1,13 +1,22 @@
 # helper/setup_db.py
+import argparse
 import logging
 from helper.database import check_connection, create_database, create_table
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--migrate",
+        action="store_true",
+        help="Convert an existing chunks.embedding column to VECTOR_PRECISION (drops and rebuilds the HNSW index)",
+    )
+    args = parser.parse_args()
+
     print("🔧 Starting DB setup...")
 
     check_connection()
     create_database()
-    create_table()
+    create_table(migrate=args.migrate)
 
     print("✅ Setup complete.")
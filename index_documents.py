@@ -1,15 +1,24 @@
 # index_documents.py
 from pathlib import Path
-from helper.extractor import extract_text
+from typing import Iterable, Iterator
+from helper.extractor import extract_text, extract_text_iter
 from helper.chunker import (
     chunk_fixed,
+    chunk_fixed_stream,
     chunk_by_sentences,
-    chunk_by_paragraphs
+    chunk_by_paragraphs,
+    chunk_by_paragraphs_stream
 )
-from helper.embedder import get_embedding
-from helper.database import insert_chunk
+from helper.embedder import get_embedding, get_embeddings_batch, EMBEDDING_BATCH_SIZE
+from helper.database import insert_chunks_bulk, delete_chunks
+import numpy as np
 from tqdm import tqdm
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import deque
+from queue import Queue
+from itertools import islice
 from logging import basicConfig, getLogger, INFO
+import os
 import sys
 
 
@@ -44,6 +53,34 @@ def load_file(path: Path) -> str:
     return extract_text(path)
 
 
+def load_pages(path: Path) -> Iterator[str]:
+    """
+    Lazily yield the text of a supported document piece by piece.
+
+    Pieces are PDF pages or DOCX paragraphs plus the separators between
+    them; joined, they equal `load_file(path)`.
+
+    Parameters
+    ----------
+    path : Path
+        Path to the .pdf or .docx file.
+
+    Yields
+    ------
+    str
+        Cleaned page/paragraph text, or a separator.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file does not exist.
+    """
+    log.info(f"📄 Reading file: {path.name}")
+    if not path.exists():
+        raise FileNotFoundError(f"❌ File not found: {path}")
+    yield from extract_text_iter(path)
+
+
 # 2. Choose chunking strategy
 def split_text(text: str, strategy: str) -> list[str]:
     """
@@ -77,34 +114,114 @@ def split_text(text: str, strategy: str) -> list[str]:
         raise ValueError(f"❌ Unknown strategy: {strategy}")
 
 
-# 3. Embed each chunk with Gemini
-def embed_chunks(chunks: list[str]) -> list[dict]:
+def split_pages(pages: Iterable[str], strategy: str) -> Iterator[str]:
     """
-    Generate embeddings for each chunk using Gemini API.
+    Lazily split a stream of text pieces using the selected chunking strategy.
+
+    The fixed and paragraph strategies consume pieces lazily; the sentence
+    strategy needs the full text and joins the pieces first. Either way the
+    chunks are the same as `split_text` on the joined pieces.
 
     Parameters
     ----------
-    chunks : list[str]
-        List of text chunks.
+    pages : Iterable[str]
+        Text pieces in document order, as yielded by `load_pages`.
+    strategy : str
+        One of {"fixed", "sentence", "paragraph"}.
+
+    Yields
+    ------
+    str
+        Text chunks, in document order.
+    """
+    if strategy == "fixed":
+        log.info(f"✂️ Splitting text using strategy: {strategy}")
+        yield from chunk_fixed_stream(pages)
+    elif strategy == "paragraph":
+        log.info(f"✂️ Splitting text using strategy: {strategy}")
+        yield from chunk_by_paragraphs_stream(pages)
+    else:
+        yield from split_text("".join(pages), strategy)
+
+
+# 3. Embed chunks with Gemini, batches in flight concurrently
+def embed_batch(batch: list[str]) -> list[tuple[str, np.ndarray]]:
+    """
+    Embed one batch of chunks with a single API request.
+
+    If the batch request fails, the chunks are retried one by one so a
+    single bad chunk does not drop the whole batch.
+
+    Parameters
+    ----------
+    batch : list[str]
+        Text chunks for one request.
 
     Returns
     -------
-    list[dict]
-        List of dicts with 'text' and 'embedding'.
+    list[tuple[str, np.ndarray]]
+        (chunk, embedding) pairs in batch order; chunks that still fail are skipped.
     """
-    log.info(f"🧠 Generating embeddings for {len(chunks)} chunks...")
+    try:
+        return list(zip(batch, get_embeddings_batch(batch)))
+    except Exception as e:
+        print(f"⚠️ Batch of {len(batch)} chunks failed, retrying one by one: {e}")
+
     result = []
-    for chunk in tqdm(chunks):
+    for chunk in batch:
         try:
-            embedding = get_embedding(chunk)
-            result.append({"text": chunk, "embedding": embedding})
+            result.append((chunk, get_embedding(chunk)))
         except Exception as e:
             print(f"⚠️ Failed to embed chunk: {e}")
     return result
 
 
+def embed_chunks(
+    chunks: list[str],
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    max_workers: int = 8
+) -> list[dict]:
+    """
+    Generate embeddings for the chunks using batched Gemini API requests.
+
+    Batches are sent from a thread pool so that up to `max_workers`
+    requests are in flight at once.
+
+    Parameters
+    ----------
+    chunks : list[str]
+        List of text chunks.
+    batch_size : int
+        Number of chunks sent per API request.
+    max_workers : int
+        Maximum number of concurrent API requests.
+
+    Returns
+    -------
+    list[dict]
+        List of dicts with 'text' and 'embedding' (float32 array), in chunk order.
+        Chunks that fail even when retried alone are skipped.
+    """
+    log.info(f"🧠 Generating embeddings for {len(chunks)} chunks...")
+    batches = [chunks[i:i + batch_size] for i in range(0, len(chunks), batch_size)]
+    embedded: list[list] = [[] for _ in batches]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as ex, tqdm(total=len(chunks)) as progress:
+        futures = {ex.submit(embed_batch, batch): idx for idx, batch in enumerate(batches)}
+        for future in as_completed(futures):
+            idx = futures[future]
+            embedded[idx] = future.result()
+            progress.update(len(batches[idx]))
+
+    return [
+        {"text": chunk, "embedding": embedding}
+        for pairs in embedded
+        for chunk, embedding in pairs
+    ]
+
+
 # 4. Save to PostgreSQL
-def save_chunks(chunk_data: list[dict], filename: str, strategy: str):
+def save_chunks(chunk_data: list[dict], filename: str, strategy: str) -> int:
     """
     Insert chunks and their embeddings into the database.
 
@@ -116,39 +233,178 @@ def save_chunks(chunk_data: list[dict], filename: str, strategy: str):
         Original file name.
     strategy : str
         Chunking strategy used.
+
+    Returns
+    -------
+    int
+        Number of chunks written.
     """
     log.info(f"💾 Saving {len(chunk_data)} chunks to DB...")
-    for item in tqdm(chunk_data):
-        insert_chunk(
-            chunk_text=item["text"],
-            embedding=item["embedding"],
-            filename=filename,
-            strategy=strategy
-        )
+    return insert_chunks_bulk([
+        (item["text"], item["embedding"], filename, strategy)
+        for item in chunk_data
+    ])
+
+
+# 5. Streaming embed + save
+def index_chunks(
+    chunks: Iterable[str],
+    filename: str,
+    strategy: str,
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    max_workers: int = 8
+) -> int:
+    """
+    Embed and save chunks as a stream, one batch at a time.
+
+    Up to `max_workers` embedding batches are in flight on a thread pool.
+    Finished batches are handed, in order, through a bounded queue to a
+    dedicated DB-writer thread, so inserts overlap with the next embedding
+    requests. Only the in-flight and queued batches are ever held in memory.
+
+    Parameters
+    ----------
+    chunks : Iterable[str]
+        Text chunks, in document order.
+    filename : str
+        Original file name.
+    strategy : str
+        Chunking strategy used.
+    batch_size : int
+        Number of chunks sent per API request.
+    max_workers : int
+        Maximum number of concurrent API requests.
+
+    Returns
+    -------
+    int
+        Number of chunks written to the DB.
+    """
+    log.info(f"🧠💾 Embedding and saving chunks in batches of {batch_size}...")
+    pending = deque()
+    writes: Queue = Queue(maxsize=2)
+
+    def write_batches() -> int:
+        written = 0
+        while (pairs := writes.get()) is not None:
+            written += insert_chunks_bulk([
+                (chunk, embedding, filename, strategy)
+                for chunk, embedding in pairs
+            ])
+        return written
+
+    def flush(progress: tqdm):
+        batch, future = pending.popleft()
+        writes.put(future.result())
+        progress.update(len(batch))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as ex, \
+            ThreadPoolExecutor(max_workers=1) as db_writer, \
+            tqdm(unit="chunk") as progress:
+        writer = db_writer.submit(write_batches)
+        try:
+            for batch in _batched(chunks, batch_size):
+                pending.append((batch, ex.submit(embed_batch, batch)))
+                if len(pending) >= max_workers:
+                    flush(progress)
+            while pending:
+                flush(progress)
+        finally:
+            writes.put(None)
+        return writer.result()
+
+
+def check_batch_size(batch_size: int) -> int:
+    """
+    Validate the number of chunks per embedding request.
+
+    Parameters
+    ----------
+    batch_size : int
+        Requested batch size.
+
+    Returns
+    -------
+    int
+        The same batch size.
+
+    Raises
+    ------
+    ValueError
+        If it is not within 1..EMBEDDING_BATCH_SIZE; larger batches are
+        rejected by the API and would fall back to one request per chunk.
+    """
+    if not 1 <= batch_size <= EMBEDDING_BATCH_SIZE:
+        raise ValueError(f"❌ batch_size must be between 1 and {EMBEDDING_BATCH_SIZE}, got {batch_size}")
+    return batch_size
+
 
+def _batched(items: Iterable[str], n: int) -> Iterator[list[str]]:
+    """Yield successive lists of up to `n` items."""
+    it = iter(items)
+    while batch := list(islice(it, n)):
+        yield batch
 
-# 5. Orchestration
-def process_file(path: Path, strategy: str = "fixed"):
+
+# 6. Orchestration
+def process_file(
+    path: Path,
+    strategy: str = "fixed",
+    max_workers: int = 8,
+    batch_size: int = EMBEDDING_BATCH_SIZE
+):
     """
     Full pipeline: load file, split, embed, save.
 
+    Chunks stream from extraction through embedding into the DB batch by
+    batch; the document's chunks and embeddings are never all held at once.
+
+    Existing rows for the file and strategy are replaced, so re-running is
+    idempotent. Batches are committed while extraction is still running, so
+    if the run fails they are deleted again rather than left as a partial
+    document.
+
     Parameters
     ----------
     path : Path
         File path to process.
     strategy : str
         Chunking strategy to apply.
+    max_workers : int
+        Maximum number of concurrent embedding requests.
+    batch_size : int
+        Number of chunks sent per embedding request, 1..EMBEDDING_BATCH_SIZE.
+
+    Raises
+    ------
+    ValueError
+        If `batch_size` is out of range.
+    Exception
+        Any extraction, embedding or DB error, after this run's rows are
+        deleted.
     """
+    check_batch_size(batch_size)
     try:
-        text = load_file(path)
-        chunks = split_text(text, strategy)
-        chunks = [c for c in chunks if c.strip()]
-
-        embeddings = embed_chunks(chunks)
-        save_chunks(embeddings, filename=path.name, strategy=strategy)
-        log.info("✅ Done!")
+        replaced = delete_chunks(path.name, strategy)
+        if replaced:
+            log.info(f"🧹 Replacing {replaced} previously indexed chunks.")
+        chunks = (c for c in split_pages(load_pages(path), strategy) if c.strip())
+        try:
+            saved = index_chunks(
+                chunks,
+                filename=path.name,
+                strategy=strategy,
+                batch_size=batch_size,
+                max_workers=max_workers
+            )
+        except BaseException:
+            # Also on Ctrl+C: no half-indexed document may look finished
+            delete_chunks(path.name, strategy)
+            raise
+        log.info(f"✅ Done! Indexed {saved} chunks.")
     except Exception as e:
         log.exception(f"❌ Fatal error during processing: {e}")
+        raise
 
 
 # CLI entrypoint
@@ -158,10 +414,34 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("file", type=str, help="Path to .pdf or .docx file")
     parser.add_argument("--strategy", choices=["fixed", "sentence", "paragraph"], default="fixed")
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=int(os.getenv("EMBED_MAX_WORKERS", 8)),
+        help="Concurrent embedding requests (env EMBED_MAX_WORKERS)"
+    )
+    def batch_size_arg(value: str) -> int:
+        try:
+            return check_batch_size(int(value))
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e))
+
+    parser.add_argument(
+        "--batch-size",
+        type=batch_size_arg,
+        # A string default goes through `type` too, so EMBED_BATCH_SIZE is validated
+        default=os.getenv("EMBED_BATCH_SIZE", str(EMBEDDING_BATCH_SIZE)),
+        help=f"Chunks per embedding request (max {EMBEDDING_BATCH_SIZE}, env EMBED_BATCH_SIZE)"
+    )
     args = parser.parse_args()
 
     try:
-        process_file(Path(args.file), args.strategy)
+        process_file(
+            Path(args.file),
+            args.strategy,
+            max_workers=args.max_workers,
+            batch_size=args.batch_size
+        )
     except Exception as e:
         log.error("❌ Failed to complete indexing.")
         sys.exit(1)
@@ -1,23 +1,38 @@
 # search_documents.py
 import logging
+import os
+from functools import lru_cache
 from typing import List, Dict, Callable, Optional, Any, Tuple
-from helper.database import pooled_connection
-from helper.embedder import get_embedding, l2_normalize
+import numpy as np
+from helper.database import pooled_connection, HNSW_EF_SEARCH, HNSW_EF_SEARCH_MAX, VECTOR_TYPE
+from helper.embedder import get_embedding, l2_normalize, EMBEDDING_DIM
 
 log = logging.getLogger(__name__)
 
+# Widen the HNSW candidate list for better recall at some latency cost (WIDE_SEARCH=1)
+WIDE_SEARCH = os.getenv("WIDE_SEARCH", "0") == "1"
+WIDE_SEARCH_EF_FACTOR = 10
 
-def embed_text_gemini(text: str) -> List[float]:
+
+@lru_cache(maxsize=2048)
+def embed_text_gemini(text: str) -> np.ndarray:
     """
     Embeds a free-text query using Gemini and normalizes the vector.
 
+    Results are cached per exact query text, so repeated searches skip the
+    API round trip. Failed calls raise and are not cached.
+
     Args:
         text (str): Input query.
 
     Returns:
-        List[float]: Normalized embedding vector.
+        np.ndarray: Normalized float32 embedding vector, sent to Postgres
+        through pgvector's ndarray adapter. Read-only, since the same array
+        is shared by every caller of a cached query.
     """
-    return l2_normalize(get_embedding(text))
+    vec = l2_normalize(get_embedding(text))
+    vec.flags.writeable = False
+    return vec
 
 
 def build_where_clause(
@@ -48,13 +63,118 @@ def build_where_clause(
     where_sql = f"WHERE {' AND '.join(clauses)}" if clauses else ""
     return where_sql, values
 
+def supports_iterative_scan(cur) -> bool:
+    """
+    Check (once per connection) whether the installed pgvector supports
+    `hnsw.iterative_scan`, which was added in pgvector 0.8.
+
+    Args:
+        cur (psycopg2.extensions.cursor): Cursor on a pooled connection.
+
+    Returns:
+        bool: True if iterative index scans can be enabled.
+    """
+    conn = cur.connection
+    supported = getattr(conn, "_iterative_scan", None)
+    if supported is None:
+        cur.execute("""
+            SELECT string_to_array(extversion, '.')::int[] >= '{0,8}'
+            FROM pg_extension WHERE extname = 'vector';
+        """)
+        row = cur.fetchone()
+        supported = conn._iterative_scan = bool(row and row[0])
+    return supported
+
+
+def hnsw_ef_search(top_k: int, filtered: bool, wide: bool) -> int:
+    """
+    Compute the `hnsw.ef_search` value for one search.
+
+    HNSW returns at most ef_search rows, so it always covers top_k. Filtered
+    searches start wider, since candidates may fail the filter, and a wide
+    search multiplies the list by WIDE_SEARCH_EF_FACTOR. The result is capped
+    at the maximum pgvector accepts.
+
+    Args:
+        top_k (int): Number of rows the query returns.
+        filtered (bool): Whether the query has a WHERE filter.
+        wide (bool): Whether to widen the candidate list.
+
+    Returns:
+        int: Value for `SET LOCAL hnsw.ef_search`.
+    """
+    ef_search = max(top_k, HNSW_EF_SEARCH)
+    if filtered:
+        ef_search = max(ef_search, top_k * 10, 100)
+    if wide:
+        ef_search *= WIDE_SEARCH_EF_FACTOR
+    return min(ef_search, HNSW_EF_SEARCH_MAX)
+
+
+def prepare_search(cur, has_filename: bool, has_strategy: bool) -> str:
+    """
+    Return the name of the server-side prepared search statement for this
+    filter combination, preparing it on first use per connection.
+
+    Four variants exist, one per (filename, strategy) filter combination.
+    Their names are cached on the connection, so the hot path only issues
+    EXECUTE and skips re-parsing/planning the SQL. This only pays off on
+    connections the pool keeps: one released while POSTGRES_POOL_MIN idle
+    connections are already kept is closed, so with more concurrent
+    searches than that the extra connections prepare again every time.
+
+    Args:
+        cur (psycopg2.extensions.cursor): Cursor on a pooled connection.
+        has_filename (bool): Whether the statement filters by filename.
+        has_strategy (bool): Whether the statement filters by strategy.
+
+    Returns:
+        str: Prepared statement name, e.g. "search_q_fs".
+    """
+    conn = cur.connection
+    prepared = getattr(conn, "_prepared_searches", None)
+    if prepared is None:
+        prepared = conn._prepared_searches = set()
+
+    name = "search_q_" + ("f" if has_filename else "") + ("s" if has_strategy else "")
+    if name in prepared:
+        return name
+
+    # Dimension is fixed by the embedding model, so it is baked into the statement;
+    # the query vector uses the column's type so `<=>` matches the HNSW opclass
+    arg_types = [f"{VECTOR_TYPE}({EMBEDDING_DIM})"]
+    clauses = []
+    if has_filename:
+        arg_types.append("text")
+        clauses.append(f"filename = ${len(arg_types)}")
+    if has_strategy:
+        arg_types.append("text")
+        clauses.append(f"split_strategy = ${len(arg_types)}")
+    arg_types.append("int")
+    where_sql = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    cur.execute(f"""
+        PREPARE {name} ({', '.join(arg_types)}) AS
+        SELECT
+            id, chunk_text, filename, split_strategy, created_at,
+            (1.0 - (embedding <=> $1)) AS cosine_sim
+        FROM chunks
+        {where_sql}
+        ORDER BY embedding <=> $1
+        LIMIT ${len(arg_types)};
+    """)
+    prepared.add(name)
+    return name
+
+
 def search_documents(
     query_text: str,
     top_k: int = 5,
     *,
-    embed_fn: Callable[[str], List[float]] = embed_text_gemini,
+    embed_fn: Callable[[str], np.ndarray] = embed_text_gemini,
     filename: Optional[str] = None,
     strategy: Optional[str] = None,
+    wide_search: Optional[bool] = None,
 ) -> List[Dict[str, Any]]:
     """
     Perform semantic search over the 'chunks' table using cosine similarity.
@@ -65,6 +185,9 @@ def search_documents(
         embed_fn (Callable): Function to embed the query.
         filename (str, optional): Filter by source filename.
         strategy (str, optional): Filter by chunking strategy.
+        wide_search (bool, optional): Search a WIDE_SEARCH_EF_FACTOR times
+            longer HNSW candidate list, trading latency for recall. Still
+            returns top_k rows. Defaults to WIDE_SEARCH (env).
 
     Returns:
         List[Dict[str, Any]]: Top matching chunks and scores.
@@ -80,35 +203,39 @@ def search_documents(
         # 1. Embed query
         log.info("Embedding query text...")
         q_vec = embed_fn(query_text)
-        dim = len(q_vec)
+        if len(q_vec) != EMBEDDING_DIM:
+            raise ValueError(f"Query embedding has {len(q_vec)} dimensions, expected {EMBEDDING_DIM}.")
 
-        # 2. Prepare WHERE clause
-        where_sql, where_params = build_where_clause(filename, strategy)
+        if wide_search is None:
+            wide_search = WIDE_SEARCH
 
-        # 3. SQL query (string only, no f-strings inside values!)
-        sql = """
-        WITH q AS (
-            SELECT %s::vector(%s) AS e
-        )
-        SELECT
-            id, chunk_text, filename, split_strategy, created_at,
-            (1.0 - (embedding <=> q.e)) AS cosine_sim
-        FROM chunks, q
-        {where_clause}
-        ORDER BY embedding <=> q.e
-        LIMIT %s;
-        """.format(where_clause=where_sql)
+        # 2. Filter values, in the prepared statement's argument order
+        _, where_params = build_where_clause(filename, strategy)
+        params = [q_vec] + where_params + [top_k]
+        placeholders = ", ".join(["%s"] * len(params))
 
-        params = [q_vec, dim] + where_params + [top_k]
-
-        # 4. Execute query
+        # 3. Execute prepared query
         log.info("Running semantic search query...")
         results = []
         with pooled_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute(sql, params)
-                rows = cur.fetchall()
-                for r in rows:
+                # Scoped to this transaction; the pool rolls it back on release.
+                # The SETs travel with EXECUTE in one round trip.
+                ef_search = hnsw_ef_search(top_k, bool(where_params), wide_search)
+                set_sql = "SET LOCAL hnsw.ef_search = %s;"
+                # Filtered ANN: let pgvector keep scanning the index until
+                # enough rows pass the filter
+                if where_params and supports_iterative_scan(cur):
+                    set_sql += " SET LOCAL hnsw.iterative_scan = strict_order;"
+                params = [ef_search] + params
+
+                name = prepare_search(cur, bool(filename), bool(strategy))
+                if log.isEnabledFor(logging.DEBUG):
+                    cur.execute(f"{set_sql} EXPLAIN EXECUTE {name} ({placeholders});", params)
+                    plan = "\n".join(row[0] for row in cur.fetchall())
+                    log.debug(f"Search query plan:\n{plan}")
+                cur.execute(f"{set_sql} EXECUTE {name} ({placeholders});", params)
+                for r in cur.fetchall():
                     _id, text, fname, strat, created, sim = r
                     results.append({
                         "id": _id or "N/A",
@@ -135,6 +262,8 @@ if __name__ == "__main__":
     parser.add_argument("--filename", type=str, help="Filter by filename", default=None)
     parser.add_argument("--strategy", type=str, choices=["fixed", "sentence", "paragraph"], default=None)
     parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--wide-search", action="store_true", default=None,
+                        help="Search a 10x longer HNSW candidate list for better recall (default: env WIDE_SEARCH)")
 
     args = parser.parse_args()
 
@@ -142,7 +271,8 @@ if __name__ == "__main__":
         query_text=args.query,
         top_k=args.top_k,
         filename=args.filename,
-        strategy=args.strategy
+        strategy=args.strategy,
+        wide_search=args.wide_search
     )
 
     for i, r in enumerate(results, 1):
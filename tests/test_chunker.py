@@ -1,7 +1,13 @@
 # tests/test_chunker.py
 
 import pytest
-from helper.chunker import chunk_fixed, chunk_by_sentences, chunk_by_paragraphs
+from helper.chunker import (
+    chunk_fixed,
+    chunk_fixed_stream,
+    chunk_by_sentences,
+    chunk_by_paragraphs,
+    chunk_by_paragraphs_stream,
+)
 
 sample_text = """
 Dr. Smith went to the U.S.A. in 2020. He stayed there until 2023! Can you believe it?
@@ -38,3 +44,49 @@ def test_chunk_edge_cases(text):
     assert isinstance(chunk_fixed(text, size=50, overlap=10), list)
     assert isinstance(chunk_by_sentences(text, max_len=50), list)
     assert isinstance(chunk_by_paragraphs(text, max_len=50), list)
+
+def test_chunk_by_sentences_does_not_split_after_abbreviations():
+    chunks = chunk_by_sentences("Dr. Smith arrived. Mr. Jones left.", max_len=20)
+    assert chunks == ["Dr. Smith arrived.", "Mr. Jones left."]
+
+
+@pytest.mark.parametrize("text", [
+    "(Dr. Smith) arrived. Mr. Jones left.",
+    "\"Dr. Smith\" arrived. Mr. Jones left.",
+    "[Dr. Smith] arrived. Mr. Jones left.",
+])
+def test_chunk_by_sentences_keeps_bracketed_and_quoted_abbreviations(text):
+    chunks = chunk_by_sentences(text, max_len=10)
+    assert chunks == [text[:-len(" Mr. Jones left.")], "Mr. Jones left."]
+
+
+@pytest.mark.parametrize("text", ["Call Mr.\nSmith now. Bye.", "Call Mr. \t Smith now. Bye."])
+def test_chunk_by_sentences_joins_across_abbreviations_with_one_space(text):
+    assert chunk_by_sentences(text, max_len=12) == ["Call Mr. Smith now.", "Bye."]
+
+
+def test_chunk_fixed_stream_matches_chunk_fixed():
+    pieces = [sample_text[i:i + 37] for i in range(0, len(sample_text), 37)]
+    assert list(chunk_fixed_stream(pieces, size=100, overlap=20)) == chunk_fixed(sample_text, size=100, overlap=20)
+
+
+@pytest.mark.parametrize("piece_len", [1, 7, 37, 500])
+def test_chunk_by_paragraphs_stream_ignores_piece_boundaries(piece_len):
+    pieces = [sample_text[i:i + piece_len] for i in range(0, len(sample_text), piece_len)]
+    expected = chunk_by_paragraphs(sample_text, max_len=150)
+    assert len(expected) > 1
+    assert list(chunk_by_paragraphs_stream(pieces, max_len=150)) == expected
+
+
+def test_chunk_by_paragraphs_needs_blank_lines():
+    # Single newlines (e.g. DOCX paragraphs) do not start a new paragraph
+    text = "\n".join(["line one", "line two", "line three"])
+    pieces = ["line one", "\n", "line two", "\n", "line three"]
+    assert list(chunk_by_paragraphs_stream(pieces, max_len=12)) == chunk_by_paragraphs(text, max_len=12) == [text]
+
+
+def test_chunk_by_paragraphs_stream_large_single_paragraph():
+    # Each piece only scans the new text, not the whole pending paragraph
+    pieces = ["word "] * 200_000
+    text = "".join(pieces)
+    assert list(chunk_by_paragraphs_stream(pieces, max_len=1200)) == [text.strip()]
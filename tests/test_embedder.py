@@ -1,14 +1,15 @@
 # tests/test_embedder.py
 
-from helper.embedder import get_embedding
+from helper.embedder import get_embedding, l2_normalize
+import numpy as np
 import pytest
 
 def test_embedding_length():
     text = "Artificial Intelligence is transforming education."
     embedding = get_embedding(text)
 
-    assert isinstance(embedding, list), "❌ Output is not a list"
-    assert all(isinstance(x, float) for x in embedding), "❌ Not all elements are floats"
+    assert isinstance(embedding, np.ndarray), "❌ Output is not a numpy array"
+    assert embedding.dtype == np.float32, f"❌ Expected float32 elements, got {embedding.dtype}"
     assert len(embedding) == 768, f"❌ Expected embedding of length 768, got {len(embedding)}"
 
     print(f"✅ Got embedding with {len(embedding)} dimensions")
@@ -27,10 +28,22 @@ def test_empty_string():
 ])
 def test_various_texts(text):
     embedding = get_embedding(text)
-    assert isinstance(embedding, list)
-    assert len(embedding) == 768
+    assert isinstance(embedding, np.ndarray)
+    assert embedding.shape == (768,)
 
 
 def test_whitespace_only():
     with pytest.raises(ValueError):
-        get_embedding("   ")
\ No newline at end of file
+        get_embedding("   ")
+
+
+def test_l2_normalize_vector():
+    vec = l2_normalize([3.0, 4.0])
+    assert vec.dtype == np.float32
+    assert np.allclose(vec, [0.6, 0.8])
+
+
+def test_l2_normalize_matrix_rows():
+    mat = l2_normalize(np.array([[3.0, 4.0], [0.0, 2.0], [0.0, 0.0]]))
+    assert mat.shape == (3, 2)
+    assert np.allclose(mat, [[0.6, 0.8], [0.0, 1.0], [0.0, 0.0]])
@@ -2,7 +2,11 @@
 
 from pathlib import Path
 import pytest
-from helper.extractor import extract_text
+from docx import Document
+from docx.oxml import parse_xml
+import fitz
+from helper import extractor
+from helper.extractor import extract_text, extract_text_iter, extract_text_from_docx
 
 PDF_SAMPLE = Path("samples/file-sample_150kB.pdf")
 DOCX_SAMPLE = Path("samples/file-sample_500kB.docx")
@@ -20,3 +24,66 @@ def test_extract_text_from_docx():
     text = extract_text(DOCX_SAMPLE)
     assert isinstance(text, str), "❌ DOCX output is not a string"
     assert len(text.strip()) > 0, "❌ DOCX extraction returned empty text"
+
+
+def python_docx_text(path: Path) -> str:
+    """Reference DOCX output: python-docx's top-level paragraphs, one per line."""
+    return "\n".join(p.text.strip() for p in Document(path).paragraphs if p.text.strip())
+
+
+@pytest.mark.parametrize("path", sorted(Path("samples").glob("*.docx")), ids=lambda p: p.name)
+def test_docx_stream_matches_python_docx(path):
+    assert extract_text_from_docx(path) == python_docx_text(path)
+
+
+TEXT_BOX_XML = """
+<mc:AlternateContent
+    xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"
+    xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+    xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape"
+    xmlns:v="urn:schemas-microsoft-com:vml">
+  <mc:Choice Requires="wps">
+    <wps:txbx><w:txbxContent><w:p><w:r><w:t>Box text</w:t></w:r></w:p></w:txbxContent></wps:txbx>
+  </mc:Choice>
+  <mc:Fallback>
+    <v:textbox><w:txbxContent><w:p><w:r><w:t>Box text</w:t></w:r></w:p></w:txbxContent></v:textbox>
+  </mc:Fallback>
+</mc:AlternateContent>
+"""
+
+
+def test_docx_text_box_is_not_duplicated(tmp_path):
+    doc = Document()
+    doc.add_paragraph("Body para")
+    doc.add_paragraph("Outer").runs[0]._r.append(parse_xml(TEXT_BOX_XML))
+    path = tmp_path / "text_box.docx"
+    doc.save(path)
+
+    assert extract_text_from_docx(path) == python_docx_text(path) == "Body para\nOuter"
+
+
+@pytest.mark.skipif(not PDF_SAMPLE.exists(), reason="Missing test file: file-sample_150kB.pdf")
+def test_extract_text_iter_pdf_matches_page_join():
+    with fitz.open(str(PDF_SAMPLE)) as doc:
+        pages = [page.get_text("text").strip() for page in doc]
+    pieces = list(extract_text_iter(PDF_SAMPLE))
+    assert len(pieces) > 1, "❌ Expected the PDF to be streamed in several pieces"
+    assert "".join(pieces) == "\n\n".join(p for p in pages if p)
+
+
+@pytest.mark.skipif(not DOCX_SAMPLE.exists(), reason="Missing test file: file-sample_500kB.docx")
+def test_extract_text_iter_docx_matches_python_docx():
+    pieces = list(extract_text_iter(DOCX_SAMPLE))
+    assert len(pieces) > 1, "❌ Expected the DOCX to be streamed in several pieces"
+    assert "".join(pieces) == python_docx_text(DOCX_SAMPLE)
+
+
+@pytest.mark.skipif(not PDF_SAMPLE.exists(), reason="Missing test file: file-sample_150kB.pdf")
+def test_parallel_pdf_pages_match_sequential(monkeypatch):
+    sequential = list(extractor.iter_pages(PDF_SAMPLE))
+    # Force the process-pool path, one page per range, and run it twice on the shared pool
+    monkeypatch.setattr(extractor, "_PARALLEL_MIN_PAGES", 0)
+    monkeypatch.setattr(extractor, "_PAGES_PER_TASK", 1)
+    monkeypatch.setattr(extractor.os, "cpu_count", lambda: 2)
+    assert list(extractor.iter_pages(PDF_SAMPLE)) == sequential
+    assert list(extractor.iter_pages(PDF_SAMPLE)) == sequential
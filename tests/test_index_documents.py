@@ -1,40 +1,28 @@
 # tests/test_index_documents.py
 
-import os
+import time
 import uuid
-import ast
+import numpy as np
 import pytest
-import psycopg2
 from pathlib import Path
-from index_documents import process_file
-from dotenv import load_dotenv
-
-load_dotenv()
-
-DB_NAME = os.getenv("POSTGRES_DB")
-USER = os.getenv("POSTGRES_USER")
-PASSWORD = os.getenv("POSTGRES_PASSWORD")
-HOST = os.getenv("POSTGRES_HOST")
-PORT = int(os.getenv("POSTGRES_PORT", 5432))
+import index_documents
+from index_documents import process_file, index_chunks, embed_batch
+from helper.database import pooled_connection
 
 TEST_INPUT_FILE = Path("samples/file-sample_500kB.docx")
 
 def fetch_chunks_from_db(filename: str, strategy: str) -> list[tuple]:
-    """Fetch all chunks from DB for a given filename and strategy."""
-    conn = psycopg2.connect(
-        dbname=DB_NAME, user=USER, password=PASSWORD, host=HOST, port=PORT
-    )
-    with conn.cursor() as cur:
-        cur.execute(
-            """
-            SELECT chunk_text, embedding FROM chunks
-            WHERE filename = %s AND split_strategy = %s;
-            """,
-            (filename, strategy)
-        )
-        results = cur.fetchall()
-    conn.close()
-    return results
+    """Fetch all chunks from DB for a given filename and strategy (embeddings as pgvector values)."""
+    with pooled_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT chunk_text, embedding FROM chunks
+                WHERE filename = %s AND split_strategy = %s;
+                """,
+                (filename, strategy)
+            )
+            return cur.fetchall()
 
 
 @pytest.mark.skipif(not TEST_INPUT_FILE.exists(), reason="❌ Missing sample file for indexing test")
@@ -55,21 +43,127 @@ def test_process_file_fixed_strategy(tmp_path):
     for text, embedding in chunks:
         assert isinstance(text, str) and len(text.strip()) > 0, "❌ Invalid chunk text"
 
-        if isinstance(embedding, str):
-            try:
-                embedding = ast.literal_eval(embedding)
-            except Exception as e:
-                raise AssertionError(f"❌ Failed to parse embedding string: {embedding[:100]}") from e
-
-        assert isinstance(embedding, (list, tuple)), "❌ Embedding is not a list or tuple"
-        assert len(embedding) == 768, f"❌ Embedding length should be 768, got {len(embedding)}"
+        # pgvector's registered types parse the column, no string round trip:
+        # vector comes back as a pgvector.Vector, halfvec as a HalfVector
+        embedding = embedding.to_numpy()
+        assert embedding.shape == (768,), f"❌ Embedding shape should be (768,), got {embedding.shape}"
 
     print(f"✅ Inserted {len(chunks)} chunks for {test_filename}")
 
     # Optional: clean up DB
-    conn = psycopg2.connect(
-        dbname=DB_NAME, user=USER, password=PASSWORD, host=HOST, port=PORT
-    )
-    with conn:
-        with conn.cursor() as cur:
-            cur.execute("DELETE FROM chunks WHERE filename = %s;", (test_filename,))
+    with pooled_connection() as conn:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM chunks WHERE filename = %s;", (test_filename,))
+
+
+@pytest.mark.parametrize("batch_size", [0, -1, 101])
+def test_process_file_rejects_out_of_range_batch_size(batch_size):
+    with pytest.raises(ValueError):
+        process_file(TEST_INPUT_FILE, strategy="fixed", batch_size=batch_size)
+
+
+# ---------- Offline tests (embedding and DB writes monkeypatched) ----------
+
+def fake_embeddings_batch(texts, *args, **kwargs):
+    """Encodes each chunk's number in its vector; later batches finish first."""
+    time.sleep(0.02 / (1 + int(texts[0].split()[-1])))
+    return np.array([[float(t.split()[-1])] * 768 for t in texts], dtype=np.float32)
+
+
+def test_index_chunks_writes_in_document_order(monkeypatch):
+    written = []
+
+    def fake_insert(rows):
+        written.extend(rows)
+        return len(rows)
+
+    monkeypatch.setattr(index_documents, "get_embeddings_batch", fake_embeddings_batch)
+    monkeypatch.setattr(index_documents, "insert_chunks_bulk", fake_insert)
+
+    chunks = [f"chunk {i}" for i in range(23)]
+    saved = index_chunks(chunks, "doc.pdf", "fixed", batch_size=4, max_workers=3)
+
+    assert saved == 23
+    assert [text for text, *_ in written] == chunks
+    assert all(emb[0] == i for i, (_, emb, _, _) in enumerate(written))
+    assert {(f, s) for _, _, f, s in written} == {("doc.pdf", "fixed")}
+
+
+def test_index_chunks_counts_only_rows_written(monkeypatch):
+    monkeypatch.setattr(index_documents, "get_embeddings_batch", fake_embeddings_batch)
+    # A failed insert rolls back its whole batch and reports 0 rows
+    monkeypatch.setattr(index_documents, "insert_chunks_bulk", lambda rows: 0 if rows[0][0] == "chunk 0" else len(rows))
+
+    saved = index_chunks([f"chunk {i}" for i in range(10)], "doc.pdf", "fixed", batch_size=4, max_workers=2)
+    assert saved == 6
+
+
+def test_embed_batch_falls_back_to_single_chunks(monkeypatch):
+    def failing_batch(texts, *args, **kwargs):
+        raise RuntimeError("batch rejected")
+
+    def single(text, *args, **kwargs):
+        if text == "bad":
+            raise RuntimeError("chunk rejected")
+        return np.full(768, len(text), dtype=np.float32)
+
+    monkeypatch.setattr(index_documents, "get_embeddings_batch", failing_batch)
+    monkeypatch.setattr(index_documents, "get_embedding", single)
+
+    pairs = embed_batch(["a", "bad", "ccc"])
+    assert [chunk for chunk, _ in pairs] == ["a", "ccc"]
+    assert [emb[0] for _, emb in pairs] == [1.0, 3.0]
+
+
+class FakeChunksTable:
+    """In-memory stand-in for the chunks table's insert and delete helpers."""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+
+    def insert(self, rows):
+        self.rows.extend(rows)
+        return len(rows)
+
+    def delete(self, filename, strategy):
+        kept = [r for r in self.rows if (r[2], r[3]) != (filename, strategy)]
+        deleted, self.rows = len(self.rows) - len(kept), kept
+        return deleted
+
+
+def test_process_file_removes_partial_document_on_failure(monkeypatch, tmp_path):
+    table = FakeChunksTable([("other", np.zeros(768), "other.pdf", "fixed")])
+
+    def failing_pages(path):
+        # Enough text for several committed batches before the failure
+        for _ in range(3):
+            yield "word " * 400
+        raise RuntimeError("page 4 is corrupt")
+
+    monkeypatch.setattr(index_documents, "load_pages", failing_pages)
+    monkeypatch.setattr(index_documents, "get_embeddings_batch",
+                        lambda texts, *a, **kw: np.zeros((len(texts), 768), dtype=np.float32))
+    monkeypatch.setattr(index_documents, "insert_chunks_bulk", table.insert)
+    monkeypatch.setattr(index_documents, "delete_chunks", table.delete)
+
+    with pytest.raises(RuntimeError, match="page 4"):
+        process_file(tmp_path / "doc.pdf", strategy="fixed", batch_size=1, max_workers=1)
+
+    assert [r[2] for r in table.rows] == ["other.pdf"]
+
+
+def test_process_file_replaces_previous_run(monkeypatch, tmp_path):
+    table = FakeChunksTable()
+    monkeypatch.setattr(index_documents, "load_pages", lambda path: iter(["word " * 400]))
+    monkeypatch.setattr(index_documents, "get_embeddings_batch",
+                        lambda texts, *a, **kw: np.zeros((len(texts), 768), dtype=np.float32))
+    monkeypatch.setattr(index_documents, "insert_chunks_bulk", table.insert)
+    monkeypatch.setattr(index_documents, "delete_chunks", table.delete)
+
+    process_file(tmp_path / "doc.pdf", strategy="fixed")
+    first = len(table.rows)
+    process_file(tmp_path / "doc.pdf", strategy="fixed")
+
+    assert first > 0
+    assert len(table.rows) == first
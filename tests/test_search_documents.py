@@ -2,23 +2,25 @@
 
 import pytest
 import numpy as np
-from search_documents import search_documents
-from helper.database import get_connection, insert_chunk
+import search_documents as search_module
+from search_documents import search_documents, hnsw_ef_search
+from helper.embedder import l2_normalize
+from helper.database import insert_chunks_bulk
 from helper.database import pooled_connection
 
 # ---------- Fixtures ----------
 
-@pytest.fixture(autouse=True)
+@pytest.fixture
 def clear_chunks():
     print("\n🧼 Clearing table before test...")
     with pooled_connection() as conn:
         with conn.cursor() as cur:
-            cur.execute("DELETE FROM chunks;")
+            cur.execute("TRUNCATE chunks RESTART IDENTITY;")
             conn.commit()
 
 
 @pytest.fixture
-def seeded_chunks():
+def seeded_chunks(clear_chunks):
     """
     Seeds known embeddings into the database to test semantic search.
     Uses deterministic vectors to avoid test flakiness.
@@ -26,25 +28,21 @@ def seeded_chunks():
     print("🌱 Seeding deterministic chunks...")
 
     def make_vec(val: float):
-        # Builds a normalized vector [val, 0, 0, ..., 0] → cosine similarity will match val
-        vec = np.array([val] + [0.0]*767)
-        return vec / np.linalg.norm(vec)
-
-    for sim in [0.99, 0.95, 0.75, 0.5, 0.2]:
-        insert_chunk(
-            chunk_text=f"Chunk with sim {sim}",
-            embedding=make_vec(sim),
-            filename="test.docx",
-            strategy="fixed"
-        )
+        # Unit vector [val, sqrt(1 - val²), 0, ..., 0] → cosine similarity will match val
+        vec = np.zeros(768, dtype=np.float32)
+        vec[0] = val
+        vec[1] = np.sqrt(1 - val**2)
+        return vec
 
+    rows = [
+        (f"Chunk with sim {sim}", make_vec(sim), "test.docx", "fixed")
+        for sim in [0.99, 0.95, 0.75, 0.5, 0.2]
+    ]
     # Unrelated chunk with lower similarity
-    insert_chunk(
-        chunk_text="Other file chunk",
-        embedding=make_vec(0.3),
-        filename="other.docx",
-        strategy="dynamic"
-    )
+    rows.append(("Other file chunk", make_vec(0.3), "other.docx", "dynamic"))
+
+    # One multi-row INSERT for the whole seed; it reports 0 rows instead of raising on failure
+    assert insert_chunks_bulk(rows) == len(rows)
 
 
 @pytest.fixture
@@ -54,8 +52,7 @@ def fake_embed_fn():
     to simulate a realistic cosine search scenario.
     """
     def _fn(text: str):
-        vec = np.array([1.0] + [0.0]*767)
-        return vec / np.linalg.norm(vec)
+        return l2_normalize([1.0] + [0.0]*767)
     return _fn
 
 # ---------- Helper ----------
@@ -167,4 +164,41 @@ def test_low_score_for_unrelated_query(seeded_chunks):
 def test_fewer_results_than_top_k(seeded_chunks, fake_embed_fn):
     results = search_documents("test query", top_k=20, embed_fn=fake_embed_fn)
     assert len(results) < 20
-    assert len(results) == 6  
\ No newline at end of file
+    assert len(results) == 6  
+
+def test_wide_search_returns_same_top_k(seeded_chunks, fake_embed_fn):
+    print("🔍 Test: wide search returns top_k rows with the same filters")
+    plain = search_documents("test query", top_k=3, embed_fn=fake_embed_fn, filename="test.docx")
+    wide = search_documents("test query", top_k=3, embed_fn=fake_embed_fn, filename="test.docx", wide_search=True)
+    print_results(wide)
+
+    assert len(wide) == 3
+    assert [r["id"] for r in wide] == [r["id"] for r in plain]
+    assert [r["chunk_text"] for r in wide] == [
+        "Chunk with sim 0.99",
+        "Chunk with sim 0.95",
+        "Chunk with sim 0.75",
+    ]
+
+
+@pytest.mark.parametrize("top_k, filtered, wide, expected", [
+    (5, False, False, 40),
+    (5, False, True, 400),
+    (500, False, False, 500),
+    (5, True, False, 100),
+    (5, True, True, 1000),
+    (150, True, False, 1000),
+    (500, False, True, 1000),
+])
+def test_hnsw_ef_search(monkeypatch, top_k, filtered, wide, expected):
+    # Pin the env-configured base so the expected values do not depend on HNSW_EF_SEARCH
+    monkeypatch.setattr(search_module, "HNSW_EF_SEARCH", 40)
+    monkeypatch.setattr(search_module, "WIDE_SEARCH_EF_FACTOR", 10)
+    assert hnsw_ef_search(top_k, filtered, wide) == expected
+
+
+def test_large_top_k_with_filter(seeded_chunks, fake_embed_fn):
+    print("🔍 Test: top_k above the ef_search cap still returns results")
+    results = search_documents("test query", top_k=150, embed_fn=fake_embed_fn, filename="test.docx")
+    assert len(results) == 5
+    assert {r["filename"] for r in results} == {"test.docx"}